@@ -13,119 +13,302 @@
 
 import os
 import re
-import json
+import asyncio
+import functools
+import hashlib
+import inspect
+import time
 from datetime import timedelta, datetime, timezone
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
+import orjson
 
 # -------------------- env & intents --------------------
 
-load_dotenv()
-TOKEN = os.getenv("DISCORD_TOKEN")
-TEST_GUILD_ID = os.getenv("GUILD_ID")
-MODLOG_CHANNEL_ID = os.getenv("MODLOG_CHANNEL_ID")
+class Env(NamedTuple):
+    token: Optional[str]
+    guild_id: Optional[str]
+    modlog_channel_id: Optional[str]
+
+@functools.cache
+def _load_env() -> Env:
+    load_dotenv()
+    return Env(
+        token=os.getenv("DISCORD_TOKEN"),
+        guild_id=os.getenv("GUILD_ID"),
+        modlog_channel_id=os.getenv("MODLOG_CHANNEL_ID"),
+    )
+
+ENV = _load_env()
+TOKEN, TEST_GUILD_ID, MODLOG_CHANNEL_ID = ENV
 
 intents = discord.Intents.default()
 intents.members = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+class ModBot(commands.Bot):
+    async def setup_hook(self):
+        # runs before the gateway connects, so no interaction can race the load
+        await start_background_tasks()
+
+    async def close(self):
+        await stop_background_tasks()
+        await super().close()
+
+bot = ModBot(command_prefix="!", intents=intents)
 tree = bot.tree
 
+_MODLOG_ID = int(MODLOG_CHANNEL_ID) if MODLOG_CHANNEL_ID and MODLOG_CHANNEL_ID.isdigit() else None
+_TEST_GUILD_OBJ = discord.Object(id=int(TEST_GUILD_ID)) if TEST_GUILD_ID else None
+
 CMD_KW = {}
-if TEST_GUILD_ID:
-    CMD_KW["guild"] = discord.Object(id=int(TEST_GUILD_ID))
+if _TEST_GUILD_OBJ:
+    CMD_KW["guild"] = _TEST_GUILD_OBJ
 
 # -------------------- offense JSON helpers --------------------
 
 OFFENSE_FILE = "offenses.json"
+OFFENSE_FLUSH_DELAY = 1.5  # seconds; coalesces bursts of strikes into one write
+
+# Offense counts live in memory keyed by user ID; the flusher persists them in
+# the background, stringifying keys only when writing JSON.
+_OFFENSES: dict[int, int] = {}
+_dirty = asyncio.Event()
+_flusher_task: Optional[asyncio.Task] = None
+_write_task: Optional[asyncio.Future] = None
+
+def _atomic_write(data: dict):
+    tmp = Path(OFFENSE_FILE + ".tmp")
+    tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, OFFENSE_FILE)
+
+async def load_offenses():
+    path = Path(OFFENSE_FILE)
+    if not path.exists():
+        await asyncio.to_thread(_atomic_write, {})
+    data = orjson.loads(await asyncio.to_thread(path.read_bytes))
+    _OFFENSES.clear()
+    _OFFENSES.update({int(k): v for k, v in data.items()})
+
+async def flush_offenses():
+    global _write_task
+    _dirty.clear()
+    # Cancelling to_thread doesn't stop the thread, so the write is shielded and
+    # tracked; shutdown waits for it rather than racing it on the same temp file.
+    _write_task = asyncio.ensure_future(
+        asyncio.to_thread(_atomic_write, {str(k): v for k, v in _OFFENSES.items()})
+    )
+    try:
+        await asyncio.shield(_write_task)
+    except asyncio.CancelledError:
+        # the write may not have landed; leave it for the shutdown flush
+        _dirty.set()
+        raise
+    except Exception as e:
+        print("Saving offenses failed:", e)
+        _dirty.set()
 
-def load_offenses() -> dict:
-    if not os.path.exists(OFFENSE_FILE):
-        with open(OFFENSE_FILE, "w") as f:
-            json.dump({}, f)
-    with open(OFFENSE_FILE, "r") as f:
-        return json.load(f)
-
-def save_offenses(data: dict):
-    with open(OFFENSE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+async def _flusher():
+    while True:
+        await _dirty.wait()
+        await asyncio.sleep(OFFENSE_FLUSH_DELAY)
+        await flush_offenses()
 
 def add_offense(user_id: int) -> int:
-    data = load_offenses()
-    current = data.get(str(user_id), 0) + 1
-    data[str(user_id)] = current
-    save_offenses(data)
+    current = _OFFENSES.get(user_id, 0) + 1
+    _OFFENSES[user_id] = current
+    _dirty.set()
     return current
 
 def get_offenses(user_id: int) -> int:
-    data = load_offenses()
-    return data.get(str(user_id), 0)
+    return _OFFENSES.get(user_id, 0)
+
+def clear_offenses(user_id: int):
+    _OFFENSES[user_id] = 0
+    _dirty.set()
 
 # -------------------- helpers --------------------
 
-DURATION_RX = re.compile(r"^\s*(\d+)\s*([smhdw])\s*$", re.I)
+DURATION_RX = re.compile(r"^\s*(\d+)\s*([smhdw])\s*$", re.I | re.ASCII)
+# offense count -> (penalty label, timeout length); anything past the table is a ban
+PENALTIES: dict[int, tuple[str, Optional[timedelta]]] = {
+    1: ("Warning", None),
+    2: ("Timeout (10m)", timedelta(minutes=10)),
+    3: ("Timeout (1h)", timedelta(hours=1)),
+}
+BAN_PENALTY: tuple[str, Optional[timedelta]] = ("Ban", None)
+QUICK_TIMEOUT = timedelta(minutes=10)
+
+LINK_RX = re.compile(r"^<?https?://(?:\w+\.)?discord(?:app)?\.com/channels/(\d+)/(\d+)/(\d+)>?$", re.ASCII)
 
 def now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
+# -------------------- rate limiting --------------------
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# Discord allows 50 req/s globally; per-route limits are tighter (e.g. 5/s for deletes).
+_GLOBAL_BUCKET = TokenBucket(rate=50, burst=50)
+HTTP_BUCKETS = {
+    "delete_message": TokenBucket(rate=5, burst=5),
+    "timeout": TokenBucket(rate=5, burst=5),
+    "ban": TokenBucket(rate=5, burst=5),
+    "dm_send": TokenBucket(rate=5, burst=5),
+    "modlog_send": TokenBucket(rate=5, burst=5),
+}
+
+async def throttle(route: str):
+    await HTTP_BUCKETS[route].acquire()
+    await _GLOBAL_BUCKET.acquire()
+
+# -------------------- channel caches --------------------
+
+CHANNEL_CACHE_TTL = 30  # seconds
+PERM_CACHE_TTL = 10  # seconds; kept short since a stale grant is a visible error
+
+# guild.id -> mod-log channel, filled on first use
+_MODLOG_CHANNELS: dict[int, discord.abc.GuildChannel] = {}
+# channel.id -> (expires_at, channel), skips discord.py's walk over every guild
+_CHANNEL_CACHE: dict[int, tuple[float, discord.abc.GuildChannel | discord.Thread]] = {}
+# (channel.id, member.id) -> (expires_at, permissions)
+_PERM_CACHE: dict[tuple[int, int], tuple[float, discord.Permissions]] = {}
+
+def get_modlog_channel(guild: discord.Guild):
+    if _MODLOG_ID is None:
+        return None
+    channel = _MODLOG_CHANNELS.get(guild.id)
+    if channel is None:
+        channel = guild.get_channel(_MODLOG_ID)
+        if channel is not None:
+            _MODLOG_CHANNELS[guild.id] = channel
+    return channel
+
+async def get_channel_cached(client: discord.Client, channel_id: int):
+    now = time.monotonic()
+    hit = _CHANNEL_CACHE.get(channel_id)
+    if hit and hit[0] > now:
+        return hit[1]
+    channel = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
+    _CHANNEL_CACHE[channel_id] = (now + CHANNEL_CACHE_TTL, channel)
+    return channel
+
+def permissions_cached(channel: discord.abc.GuildChannel | discord.Thread, member: discord.Member) -> discord.Permissions:
+    key = (channel.id, member.id)
+    now = time.monotonic()
+    hit = _PERM_CACHE.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    perms = channel.permissions_for(member)
+    _PERM_CACHE[key] = (now + PERM_CACHE_TTL, perms)
+    return perms
+
+def forget_channel(channel_id: int):
+    _CHANNEL_CACHE.pop(channel_id, None)
+    for key in [k for k in _PERM_CACHE if k[0] == channel_id]:
+        del _PERM_CACHE[key]
+    for guild_id, channel in list(_MODLOG_CHANNELS.items()):
+        if channel.id == channel_id:
+            del _MODLOG_CHANNELS[guild_id]
+
+DM_CACHE_MAX = 1000
+
+# user.id -> DM channel; DMChannel has no __weakref__ slot, so this is a bounded dict
+_DM_CHANNELS: dict[int, discord.DMChannel] = {}
+
 async def dm_user(user: discord.User | discord.Member, text: str) -> bool:
+    dm = user.dm_channel or _DM_CHANNELS.get(user.id)
     try:
-        dm = await user.create_dm()
+        await throttle("dm_send")
+        if dm is None:
+            dm = await user.create_dm()
+            if len(_DM_CHANNELS) >= DM_CACHE_MAX:
+                _DM_CHANNELS.pop(next(iter(_DM_CHANNELS)))
+            _DM_CHANNELS[user.id] = dm
         await dm.send(text)
         return True
+    except discord.Forbidden:
+        # DMs closed or no shared server; nothing to retry
+        return False
     except Exception:
+        _DM_CHANNELS.pop(user.id, None)
         return False
 
 def format_rule_notice(rule: str, notes: Optional[str], td: Optional[timedelta]) -> str:
-    base: list[str] = []
     if td is not None:
-        minutes = td.total_seconds() // 60
-        pretty = (
-            f"{int(minutes)} minutes"
-            if minutes < 120
-            else f"{round(td.total_seconds()/3600, 1)} hours"
-        )
-        base.append(f"You were punished for **{pretty}** due to a rule violation.")
+        secs = td.total_seconds()
+        mins = int(secs // 60)
+        pretty = f"{mins} minutes" if mins < 120 else f"{round(secs / 3600, 1)} hours"
+        header = f"You were punished for **{pretty}** due to a rule violation."
     else:
-        base.append("You received a **warning** for a rule violation.")
-    base.append(f"**Violated rule:** {rule}")
-    if notes:
-        base.append(f"**Moderator note:** {notes}")
-    base.append("If you believe this was a mistake, you may reply here.")
-    return "\n".join(base)
-
-async def delete_message_from_link(client: discord.Client, message_link: str):
-    try:
-        link = message_link.strip().strip("<>")
-        parts = link.split("/")
-        if len(parts) < 3:
-            return None, "invalid link format"
+        header = "You received a **warning** for a rule violation."
+    note_line = f"**Moderator note:** {discord.utils.escape_markdown(notes)}\n" if notes else ""
+    return (
+        f"{header}\n"
+        f"**Violated rule:** {discord.utils.escape_markdown(rule)}\n"
+        f"{note_line}"
+        "If you believe this was a mistake, you may reply here."
+    )
 
-        channel_id = int(parts[-2])
-        message_id = int(parts[-1])
+async def delete_message_from_link(
+    client: discord.Client,
+    message_link: str,
+    expected_guild_id: Optional[int] = None,
+    reason: str = "Deleted via /strike"
+):
+    m = LINK_RX.match(message_link.strip())
+    if not m:
+        return None, "invalid link"
 
-        channel = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
+    if expected_guild_id is not None and int(m.group(1)) != expected_guild_id:
+        return None, "wrong guild"
+
+    channel_id = int(m.group(2))
+    message_id = int(m.group(3))
+
+    try:
+        channel = await get_channel_cached(client, channel_id)
         if not isinstance(channel, (discord.TextChannel, discord.Thread)):
             return None, "not a text channel or thread"
 
+        # the guild segment of a link is not authoritative; the channel ID alone
+        # resolves, so confirm the channel really lives in the expected guild
+        if expected_guild_id is not None and channel.guild.id != expected_guild_id:
+            return None, "wrong guild"
+
         me = channel.guild.me  # type: ignore
-        perms = channel.permissions_for(me)
-        if not (perms.view_channel and perms.read_message_history):
-            return None, "missing permission: View Channel / Read History"
+        perms = permissions_cached(channel, me)
+        if not perms.view_channel:
+            return None, "missing permission: View Channel"
         if not perms.manage_messages:
             return None, "missing permission: Manage Messages"
 
-        msg = await channel.fetch_message(message_id)
+        # a partial message is enough to delete; fetching it first would cost an extra request
+        msg = channel.get_partial_message(message_id)
 
-        try:
-            await msg.delete(reason="Deleted via /strike")
-        except TypeError:
-            await msg.delete()
+        await delete_message(msg, reason)
 
         return msg, None
 
@@ -133,11 +316,73 @@ async def delete_message_from_link(client: discord.Client, message_link: str):
         return None, "forbidden"
     except discord.NotFound:
         return None, "not found"
-    except ValueError:
-        return None, "invalid numbers"
     except Exception as e:
         return None, f"unexpected error: {e}"
 
+# Probe the installed discord.py once instead of catching TypeError on every call.
+_USE_TIMEOUT_METHOD = (
+    hasattr(discord.Member, "timeout")
+    and "until" in inspect.signature(discord.Member.timeout).parameters
+)
+_DELETE_TAKES_REASON = "reason" in inspect.signature(discord.Message.delete).parameters
+
+async def delete_message(message: discord.Message | discord.PartialMessage, reason: str):
+    await throttle("delete_message")
+    if _DELETE_TAKES_REASON:
+        await message.delete(reason=reason)
+    else:
+        await message.delete()
+
+async def apply_timeout(member: discord.Member, until: datetime, reason: str):
+    await throttle("timeout")
+    if _USE_TIMEOUT_METHOD:
+        await member.timeout(until, reason=reason)
+    else:
+        await member.edit(timed_out_until=until, reason=reason)
+
+async def delete_safe(message: discord.Message, reason: str) -> bool:
+    try:
+        await delete_message(message, reason)
+        return True
+    except Exception:
+        return False
+
+async def timeout_safe(member: discord.Member, until: datetime, reason: str) -> Tuple[bool, Optional[str]]:
+    try:
+        await apply_timeout(member, until, reason)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+async def apply_punishment(
+    guild: discord.Guild,
+    user: discord.Member,
+    penalty: tuple[str, Optional[timedelta]],
+    reason: str
+) -> Tuple[bool, bool, Optional[str]]:
+    timed_out = False
+    banned = False
+    error = None
+    td = penalty[1]
+
+    # a PENALTIES entry with a duration is a timeout, one without is a warning
+    if td is not None:
+        timed_out, error = await timeout_safe(user, now_utc() + td, reason)
+
+    elif penalty is BAN_PENALTY:
+        try:
+            await throttle("ban")
+            await guild.ban(user, reason=reason)
+            banned = True
+        except Exception as e:
+            error = str(e)
+
+    return timed_out, banned, error
+
+MODLOG_COLOR = 0xFF4444
+MODLOG_USER_FIELD = "User"
+MODLOG_MODERATOR_FIELD = "Moderator"
+
 async def send_modlog(
     guild: discord.Guild,
     title: str,
@@ -145,31 +390,87 @@ async def send_modlog(
     moderator: discord.Member | discord.User,
     details: dict
 ):
-    if not MODLOG_CHANNEL_ID:
+    if _MODLOG_ID is None:
         return
 
-    try:
-        channel_id = int(MODLOG_CHANNEL_ID)
-    except ValueError:
+    channel = get_modlog_channel(guild)
+    if not channel:
         return
 
-    channel = guild.get_channel(channel_id)
-    if not channel:
+    fields = [
+        {"name": MODLOG_USER_FIELD, "value": f"{user} (`{user.id}`)", "inline": False},
+        {"name": MODLOG_MODERATOR_FIELD, "value": f"{moderator} (`{moderator.id}`)", "inline": False},
+    ]
+    fields.extend({"name": k, "value": str(v), "inline": False} for k, v in details.items())
+
+    embed = discord.Embed.from_dict({
+        "title": title,
+        "color": MODLOG_COLOR,
+        "timestamp": now_utc().isoformat(),
+        "fields": fields,
+    })
+
+    await throttle("modlog_send")
+    await channel.send(embed=embed)
+
+# Mod-log posts are queued so commands can respond without waiting on them;
+# a single worker drains the queue, which also keeps bursts in one channel serialized.
+_MODLOG_QUEUE: asyncio.Queue = asyncio.Queue()
+MODLOG_DRAIN_TIMEOUT = 5  # seconds to wait for queued entries on shutdown
+_modlog_worker_task: Optional[asyncio.Task] = None
+_modlog_sending = False
+
+def queue_modlog(**kwargs):
+    if _MODLOG_ID is None:
         return
+    _MODLOG_QUEUE.put_nowait(kwargs)
 
-    embed = discord.Embed(
-        title=title,
-        color=0xFF4444,
-        timestamp=now_utc()
+async def _modlog_worker():
+    global _modlog_sending
+    while True:
+        kwargs = await _MODLOG_QUEUE.get()
+        _modlog_sending = True
+        try:
+            await send_modlog(**kwargs)
+        except Exception as e:
+            print("Mod-log failed:", e)
+        finally:
+            _modlog_sending = False
+            _MODLOG_QUEUE.task_done()
+
+# -------------------- checks --------------------
+
+def requires_mod():
+    def predicate(interaction: discord.Interaction) -> bool:
+        return interaction.user.guild_permissions.moderate_members
+    return app_commands.check(predicate)
+
+QUICK_REQUIRED_PERMS = discord.Permissions(manage_messages=True, moderate_members=True)
+# Discord's UI names differ from the API flag for a few permissions
+PERM_LABELS = {"moderate_members": "Timeout Members"}
+
+def missing_permissions(member: discord.Member, required: discord.Permissions) -> Optional[str]:
+    missing = discord.Permissions(required.value & ~member.guild_permissions.value)
+    if not missing.value:
+        return None
+    return "/".join(
+        PERM_LABELS.get(name, name.replace("_", " ").title())
+        for name, has in missing if has
     )
 
-    embed.add_field(name="User", value=f"{user} (`{user.id}`)", inline=False)
-    embed.add_field(name="Moderator", value=f"{moderator} (`{moderator.id}`)", inline=False)
+def cannot_moderate(me: discord.Member, target: discord.Member, guild: discord.Guild) -> Optional[str]:
+    if target.top_role >= me.top_role or target == guild.owner:
+        return "Cannot moderate that user (role hierarchy)."
+    return None
 
-    for k, v in details.items():
-        embed.add_field(name=k, value=str(v), inline=False)
+@tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if not isinstance(error, app_commands.CheckFailure):
+        # keep discord.py's default logging for everything else
+        await app_commands.CommandTree.on_error(tree, interaction, error)
+        return
 
-    await channel.send(embed=embed)
+    await interaction.response.send_message("You need **Timeout Members**.", ephemeral=True)
 
 # -------------------- /ping --------------------
 
@@ -190,6 +491,7 @@ async def ping(interaction: discord.Interaction):
     description="Apply escalating punishments based on offense history.",
     **CMD_KW
 )
+@requires_mod()
 async def strike(
     interaction: discord.Interaction,
     user: discord.Member,
@@ -197,73 +499,52 @@ async def strike(
     notes: Optional[str] = None,
     message_link: Optional[str] = None
 ):
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("You need **Timeout Members**.", ephemeral=True)
-        return
-
     me: discord.Member = interaction.guild.me  # type: ignore
 
-    if user.top_role >= me.top_role or user == interaction.guild.owner:
-        await interaction.response.send_message("Cannot moderate that user (role hierarchy).", ephemeral=True)
+    err = cannot_moderate(me, user, interaction.guild)
+    if err:
+        await interaction.response.send_message(err, ephemeral=True)
         return
 
     await interaction.response.defer(ephemeral=True, thinking=True)
 
-    deleted_msg = None
-    delete_err = None
-    if message_link:
-        deleted_msg, delete_err = await delete_message_from_link(
-            interaction.client,
-            message_link
-        )
-
     offense = add_offense(user.id)
 
-    if offense == 1:
-        punishment = "Warning"
-        td = None
-    elif offense == 2:
-        punishment = "Timeout (10m)"
-        td = timedelta(minutes=10)
-    elif offense == 3:
-        punishment = "Timeout (1h)"
-        td = timedelta(hours=1)
-    else:
-        punishment = "Ban"
-        td = None
+    penalty = PENALTIES.get(offense, BAN_PENALTY)
+    punishment, td = penalty
 
-    timed_out = False
-    banned = False
-    error = None
-
-    if td is None and offense == 1:
-        pass
-
-    elif td and offense in (2, 3):
-        until = now_utc() + td
-        try:
-            await user.timeout(until, reason=f"{rule} — {notes or ''}")
-            timed_out = True
-        except TypeError:
-            try:
-                await user.edit(timed_out_until=until, reason=f"{rule} — {notes or ''}")
-                timed_out = True
-            except Exception as e:
-                error = str(e)
-        except Exception as e:
-            error = str(e)
+    # built once so every audit-log entry for this strike carries the same reason
+    audit_reason = f"{rule} — {notes}" if notes else rule
+    dm_text = format_rule_notice(rule, notes, td)
 
-    else:
-        try:
-            await interaction.guild.ban(user, reason=f"{rule} — {notes or ''}")
-            banned = True
-        except Exception as e:
-            error = str(e)
+    deleted_msg, delete_err = None, None
+    delete_job = None
+    if message_link:
+        delete_job = delete_message_from_link(
+            interaction.client,
+            message_link,
+            expected_guild_id=interaction.guild.id,
+            reason=audit_reason
+        )
+        if penalty is BAN_PENALTY:
+            # a ban purges the user's recent messages, which would make a concurrent
+            # delete report "not found"; delete first so the outcome is accurate
+            deleted_msg, delete_err = await delete_job
+            delete_job = None
+
+    # delete, punishment and DM hit independent endpoints, so run them together
+    jobs = [
+        apply_punishment(interaction.guild, user, penalty, audit_reason),
+        dm_user(user, dm_text),
+    ]
+    if delete_job:
+        jobs.append(delete_job)
 
-    dm_ok = await dm_user(
-        user,
-        format_rule_notice(rule, notes, td)
-    )
+    results = await asyncio.gather(*jobs)
+    timed_out, banned, error = results[0]
+    dm_ok = results[1]
+    if delete_job:
+        deleted_msg, delete_err = results[2]
 
     summary = [
         f"• Offense count: **{offense}**",
@@ -299,7 +580,7 @@ async def strike(
             "Yes" if deleted_msg else f"No ({delete_err})"
         )
 
-    await send_modlog(
+    queue_modlog(
         guild=interaction.guild,
         title="Strike Issued",
         user=user,
@@ -317,11 +598,8 @@ async def strike(
     description="Check how many offenses a user has.",
     **CMD_KW
 )
+@requires_mod()
 async def offenses(interaction: discord.Interaction, user: discord.Member):
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("You need **Timeout Members**.", ephemeral=True)
-        return
-
     count = get_offenses(user.id)
     await interaction.response.send_message(
         f"⚖️ **{user}** currently has **{count} offense(s)**.",
@@ -338,21 +616,16 @@ async def offenses(interaction: discord.Interaction, user: discord.Member):
     description="Reset a user's offense count to zero.",
     **CMD_KW
 )
+@requires_mod()
 async def reset_offenses(interaction: discord.Interaction, user: discord.Member):
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("You need **Timeout Members**.", ephemeral=True)
-        return
-
-    data = load_offenses()
-    data[str(user.id)] = 0
-    save_offenses(data)
+    clear_offenses(user.id)
 
     await interaction.response.send_message(
         f"♻️ Offenses for **{user}** have been **reset to 0**.",
         ephemeral=True
     )
 
-    await send_modlog(
+    queue_modlog(
         guild=interaction.guild,
         title="Offense Count Reset",
         user=user,
@@ -363,15 +636,13 @@ async def reset_offenses(interaction: discord.Interaction, user: discord.Member)
 # -------------------- Context Menu: Delete & Timeout (10m) --------------------
 
 @tree.context_menu(name="Delete & Timeout (10m)", **CMD_KW)
+@requires_mod()
 async def quick_delete_timeout(interaction: discord.Interaction, message: discord.Message):
     me: discord.Member = interaction.guild.me  # type: ignore
 
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("You need **Timeout Members**.", ephemeral=True)
-        return
-
-    if not (me.guild_permissions.manage_messages and me.guild_permissions.moderate_members):
-        await interaction.response.send_message("Missing Manage Messages/Timeout Members.", ephemeral=True)
+    missing = missing_permissions(me, QUICK_REQUIRED_PERMS)
+    if missing:
+        await interaction.response.send_message(f"Missing {missing}.", ephemeral=True)
         return
 
     target = message.author if isinstance(message.author, discord.Member) else None
@@ -379,42 +650,22 @@ async def quick_delete_timeout(interaction: discord.Interaction, message: discor
         await interaction.response.send_message("User not found.", ephemeral=True)
         return
 
-    if target.top_role >= me.top_role or target == interaction.guild.owner:
-        await interaction.response.send_message("Cannot moderate (role hierarchy).", ephemeral=True)
+    err = cannot_moderate(me, target, interaction.guild)
+    if err:
+        await interaction.response.send_message(err, ephemeral=True)
         return
 
     await interaction.response.defer(ephemeral=True, thinking=True)
 
-    deleted = False
-    try:
-        try:
-            await message.delete(reason=f"By {interaction.user} via context menu")
-        except TypeError:
-            await message.delete()
-        deleted = True
-    except Exception:
-        deleted = False
-
-    td = timedelta(minutes=10)
-    until = now_utc() + td
+    td = QUICK_TIMEOUT
     rule = "Rule violation"
-    reason = f"{rule} — context menu"
-    timed_out = False
-    timeout_err = None
 
-    try:
-        await target.timeout(until, reason=reason)
-        timed_out = True
-    except TypeError:
-        try:
-            await target.edit(timed_out_until=until, reason=reason)
-            timed_out = True
-        except Exception as e:
-            timeout_err = str(e)
-    except Exception as e:
-        timeout_err = str(e)
-
-    dm_ok = await dm_user(target, format_rule_notice(rule, None, td))
+    # delete, timeout and DM don't depend on each other, so run them together
+    deleted, (timed_out, timeout_err), dm_ok = await asyncio.gather(
+        delete_safe(message, f"By {interaction.user} via context menu"),
+        timeout_safe(target, now_utc() + td, f"{rule} — context menu"),
+        dm_user(target, format_rule_notice(rule, None, td)),
+    )
 
     lines = [
         f"• Message: {'deleted' if deleted else 'not deleted'}",
@@ -424,7 +675,7 @@ async def quick_delete_timeout(interaction: discord.Interaction, message: discor
 
     await interaction.followup.send("\n".join(lines), ephemeral=True)
 
-    await send_modlog(
+    queue_modlog(
         guild=interaction.guild,
         title="Context Menu: Delete & Timeout",
         user=target,
@@ -438,22 +689,102 @@ async def quick_delete_timeout(interaction: discord.Interaction, message: discor
 
 # -------------------- startup & sync --------------------
 
-@bot.event
-async def on_ready():
+SYNC_HASH_FILE = ".last_sync_hash"
+_synced_once = False
+
+def command_spec_hash(guild: Optional[discord.abc.Snowflake]) -> str:
+    spec = {
+        "application_id": bot.application_id,
+        "guild_id": guild.id if guild else None,
+        "commands": [c.to_dict(tree) for c in tree.get_commands(guild=guild)],
+    }
+    return hashlib.sha256(orjson.dumps(spec, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+async def sync_commands():
+    # Guild command overwrites share a small daily bucket, so only sync when the specs changed.
+    h = command_spec_hash(_TEST_GUILD_OBJ)
+    path = Path(SYNC_HASH_FILE)
+    if path.exists() and path.read_text().strip() == h:
+        print("Commands unchanged, skipping sync")
+        return
+
+    if _TEST_GUILD_OBJ:
+        await tree.sync(guild=_TEST_GUILD_OBJ)
+        g = bot.get_guild(_TEST_GUILD_OBJ.id)
+        print(f"Commands synced to test guild {TEST_GUILD_ID} ({g.name if g else 'unknown'})")
+    else:
+        await tree.sync()
+        print("Commands synced globally")
+    path.write_text(h)
+
+async def start_background_tasks():
+    global _flusher_task, _modlog_worker_task
     try:
-        if TEST_GUILD_ID:
-            guild_obj = discord.Object(id=int(TEST_GUILD_ID))
-            await tree.sync(guild=guild_obj)
-            g = bot.get_guild(int(TEST_GUILD_ID))
-            print(f"Commands synced to test guild {TEST_GUILD_ID} ({g.name if g else 'unknown'})")
-        else:
-            await tree.sync()
-            print("Commands synced globally")
+        await load_offenses()
     except Exception as e:
-        print("Sync failed:", e)
+        # running with an empty table would silently reset every user's strikes
+        raise RuntimeError(f"Could not load {OFFENSE_FILE}: {e}") from e
+
+    _flusher_task = asyncio.create_task(_flusher())
+    _modlog_worker_task = asyncio.create_task(_modlog_worker())
+
+async def stop_background_tasks():
+    # give queued mod-log entries a bounded chance to go out before the worker stops
+    if _modlog_worker_task is not None and not _modlog_worker_task.done():
+        try:
+            await asyncio.wait_for(_MODLOG_QUEUE.join(), timeout=MODLOG_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            # qsize() doesn't count the entry the worker is still sending
+            unsent = _MODLOG_QUEUE.qsize() + (1 if _modlog_sending else 0)
+            print(f"Shutting down with {unsent} mod-log entries unsent")
+
+    for task in (_flusher_task, _modlog_worker_task):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    if _write_task is not None and not _write_task.done():
+        try:
+            await _write_task
+        except Exception as e:
+            print("Saving offenses failed:", e)
+
+    # strikes recorded inside the debounce window haven't been written yet
+    if _flusher_task is not None and _dirty.is_set():
+        await flush_offenses()
+
+@bot.event
+async def on_ready():
+    global _synced_once
+    if not _synced_once:
+        try:
+            await sync_commands()
+            _synced_once = True
+        except Exception as e:
+            print("Sync failed:", e)
 
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
 
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    forget_channel(channel.id)
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    forget_channel(after.id)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    _PERM_CACHE.clear()
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if bot.user and after.id == bot.user.id and before.roles != after.roles:
+        _PERM_CACHE.clear()
+
 if __name__ == "__main__":
     if not TOKEN:
         raise RuntimeError("DISCORD_TOKEN not set!")